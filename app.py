@@ -1,57 +1,191 @@
 import streamlit as st
-import google.generativeai as genai
 import json
 import time
 import warnings
 import os
-import PIL.Image
-from dotenv import load_dotenv
-from google.api_core import exceptions
+import hashlib
+import sqlite3
+import logging
+from contextlib import closing
 
-# --- 0. SUPPRESS WARNINGS ---
+# Heavy SDKs (google.generativeai, PIL) are imported lazily below so a fresh
+# worker can render its first page without paying for them. See bench_import.py.
+
+# --- 0. PAGE CONFIG & WARNINGS ---
 warnings.filterwarnings("ignore")
 
+st.set_page_config(
+    page_title="SchemeSetu - Government Schemes Finder", 
+    page_icon="🏛️", 
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
 # --- 1. CONFIGURATION ---
-load_dotenv()
+@st.cache_resource
+def load_env():
+    """Read .env into the environment once per process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+load_env()
 API_KEY = os.getenv("GOOGLE_API_KEY")
 
 if not API_KEY:
+    # Re-read .env on the next refresh, so creating it doesn't need a restart
+    load_env.clear()
     st.error("⚠️ Error: API Key not found. Please create a .env file and add your GOOGLE_API_KEY.")
     st.stop()
 
-genai.configure(api_key=API_KEY)
+@st.cache_resource
+def get_genai():
+    """Import and configure the Gemini SDK on first use, once per process."""
+    import google.generativeai as genai
+    genai.configure(api_key=API_KEY)
+    return genai
+
+# Multi-replica mode: point every replica at the same SQLite file to share caches and the quota.
+# SQLite (WAL mode) is a same-host stand-in; do not put this file on NFS or another network volume.
+SHARED_DB_PATH = os.getenv("SCHEMESETU_SHARED_DB")
+GLOBAL_RPM = int(os.getenv("SCHEMESETU_GLOBAL_RPM", "15"))
+RESPONSE_TTL = int(os.getenv("SCHEMESETU_RESPONSE_TTL", "3600"))
+MODEL_TTL = 6 * 3600
+FALLBACK_MODEL = "gemini-1.5-flash"
+
+log = logging.getLogger("schemesetu")
+
+# --- 1B. SHARED STATE (MULTI-REPLICA MODE) ---
+def _create_schema(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS quota (window INTEGER PRIMARY KEY, used INTEGER)")
+
+@st.cache_resource
+def _init_shared_db():
+    """Startup check, once per process; raises sqlite3.Error if the path is unusable."""
+    with closing(sqlite3.connect(SHARED_DB_PATH, timeout=10, isolation_level=None)) as conn:
+        _create_schema(conn)
+
+def _run_shared(op):
+    """Run op(conn) on a fresh connection, recreating the schema if the file was replaced."""
+    with closing(sqlite3.connect(SHARED_DB_PATH, timeout=10, isolation_level=None)) as conn:
+        try:
+            return op(conn)
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e): raise
+            if conn.in_transaction: conn.execute("ROLLBACK")
+            _create_schema(conn)
+            return op(conn)
+
+def shared_get(key):
+    if not SHARED_DB_PATH: return None
+    try:
+        row = _run_shared(lambda conn: conn.execute(
+            "SELECT value, expires FROM kv WHERE key = ?", (key,)).fetchone())
+    except sqlite3.Error as e:
+        log.warning("Shared cache read failed for %s: %s", key, e)
+        return None
+    if not row or row[1] < time.time(): return None
+    return json.loads(row[0])
+
+def shared_set(key, value, ttl):
+    if not SHARED_DB_PATH: return
+    now = time.time()
+    def op(conn):
+        conn.execute("INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)",
+                     (key, json.dumps(value), now + ttl))
+        conn.execute("DELETE FROM kv WHERE expires < ?", (now,))
+    try:
+        _run_shared(op)
+    except sqlite3.Error as e:
+        log.warning("Shared cache write failed for %s: %s", key, e)
+
+def acquire_llm_slot(max_wait=30):
+    """Take one request from the global per-minute budget shared by all replicas.
+
+    Returns False when the budget stays exhausted for max_wait. If the shared DB stays
+    locked or unavailable for that long, the last sqlite3.Error is raised instead, so the
+    request is refused rather than let through unmetered.
+    """
+    if not SHARED_DB_PATH: return True
+    deadline = time.time() + max_wait
+    while True:
+        now = time.time()
+        window = int(now // 60)
+        def op(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT used FROM quota WHERE window = ?", (window,)).fetchone()
+            used = row[0] if row else 0
+            if used < GLOBAL_RPM:
+                conn.execute("INSERT OR REPLACE INTO quota (window, used) VALUES (?, ?)", (window, used + 1))
+                conn.execute("DELETE FROM quota WHERE window < ?", (window,))
+            conn.execute("COMMIT")
+            return used
+        try:
+            used = _run_shared(op)
+        except sqlite3.Error as e:
+            log.warning("Global rate limiter unavailable: %s", e)
+            if time.time() + 1 > deadline: raise
+            time.sleep(1)
+            continue
+        if used < GLOBAL_RPM: return True
+        wait = (window + 1) * 60 - now
+        if now + wait > deadline: return False
+        time.sleep(wait)
+
+if SHARED_DB_PATH:
+    try:
+        _init_shared_db()
+    except sqlite3.Error as e:
+        st.error(f"⚠️ Error: Shared cache at SCHEMESETU_SHARED_DB could not be opened ({e}). Check the path or unset it.")
+        st.stop()
 
 # --- 2. MODEL SETUP ---
 def get_best_model():
     try:
         available_models = []
-        for m in genai.list_models():
+        for m in get_genai().list_models():
             if 'generateContent' in m.supported_generation_methods:
                 available_models.append(m.name)
         preferred_order = ["models/gemini-1.5-flash", "models/gemini-1.5-pro", "models/gemini-1.0-pro"]
         for preferred in preferred_order:
             if preferred in available_models: return preferred
-        return available_models[0] if available_models else "gemini-1.5-flash"
-    except: return "gemini-1.5-flash"
+        return available_models[0] if available_models else None
+    except Exception as e:
+        log.warning("Model discovery failed: %s", e)
+        return None
 
-WORKING_MODEL_NAME = get_best_model()
+@st.cache_resource(ttl=MODEL_TTL)
+def get_working_model_name():
+    """Discovered on the first LLM call rather than at import, then reused for MODEL_TTL.
+
+    Returns None when discovery fails; only a real discovery result is shared with other replicas.
+    """
+    model_name = shared_get("model_name")
+    if not model_name:
+        model_name = get_best_model()
+        if model_name: shared_set("model_name", model_name, MODEL_TTL)
+    return model_name
 
 # Load Database
+@st.cache_resource(max_entries=1)
+def load_scheme_db(mtime):
+    """Each replica serves its own schemes.json; the hash versions the shared response cache.
+
+    Cached per file mtime, so an edited catalog is picked up on the next rerun.
+    """
+    with open('schemes.json', 'rb') as f:
+        raw = f.read()
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    return version, json.loads(raw)
+
 try:
-    with open('schemes.json', 'r') as f:
-        SCHEME_DB = json.load(f)
+    CATALOG_VERSION, SCHEME_DB = load_scheme_db(os.path.getmtime('schemes.json'))
 except FileNotFoundError:
     st.error("Error: schemes.json not found.")
     st.stop()
 
 # --- 3. UI & CSS WIZARDRY (PROFESSIONAL DESIGN) ---
-st.set_page_config(
-    page_title="SchemeSetu - Government Schemes Finder", 
-    page_icon="🏛️", 
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
 st.markdown("""
 <style>
     /* PROFESSIONAL COLOR PALETTE */
@@ -366,7 +500,11 @@ st.markdown("""
 
 # --- 4. THE INTELLIGENT ASSISTANT ---
 def ask_llm(history, schemes_context, current_domain, language, uploaded_image=None):
-    model = genai.GenerativeModel(WORKING_MODEL_NAME)
+    model_name = get_working_model_name()
+    if not model_name:
+        # Retry discovery on the next call instead of pinning the fallback for MODEL_TTL
+        get_working_model_name.clear()
+        model_name = FALLBACK_MODEL
     
     system_instruction = f"""
     ### ROLE
@@ -416,10 +554,27 @@ def ask_llm(history, schemes_context, current_domain, language, uploaded_image=N
     
     messages_payload.append("\nASSISTANT:")
 
+    # Text-only turns are cached across replicas; keyed on catalog version so edits invalidate them
+    cache_key = None
+    if not uploaded_image:
+        fingerprint = json.dumps([model_name, CATALOG_VERSION, current_domain, language, history])
+        cache_key = "response:" + hashlib.sha256(fingerprint.encode()).hexdigest()
+        cached = shared_get(cache_key)
+        if cached: return cached
+
+    try:
+        if not acquire_llm_slot():
+            return "⏳ We're handling a lot of requests right now. Please try again in a minute."
+    except sqlite3.Error:
+        return "⚠️ The shared request budget is unavailable right now. Please try again in a moment."
+
     try:
-        return model.generate_content(messages_payload).text
+        model = get_genai().GenerativeModel(model_name)
+        response_text = model.generate_content(messages_payload).text
     except Exception as e:
         return "⚠️ Unable to process your request. Please try again in a moment."
+    if cache_key: shared_set(cache_key, response_text, RESPONSE_TTL)
+    return response_text
 
 # --- 5. SIDEBAR (PROFESSIONAL DESIGN) ---
 with st.sidebar:
@@ -481,7 +636,10 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
-    pil_image = PIL.Image.open(uploaded_file) if uploaded_file else None
+    pil_image = None
+    if uploaded_file:
+        import PIL.Image
+        pil_image = PIL.Image.open(uploaded_file)
 
 # --- 6. SESSION STATE ---
 if "messages" not in st.session_state:
@@ -0,0 +1,121 @@
+"""Cold-start benchmark for app.py.
+
+Runs app.py in Streamlit's bare mode (plain `python`, no server) in a fresh
+interpreter per sample. The first page renders with default widget values, so
+no LLM call or upload happens. Reports how long that first page took and fails
+if any module that should be deferred ended up in sys.modules. It also times
+the deferred modules on their own, which is the cost a cold start avoids.
+
+The first page is timed twice: with GOOGLE_API_KEY in the environment (how
+containers usually run) and with it in a temporary .env next to app.py (the
+setup the app's own error message asks for). The .env run is skipped if a
+.env already exists, so a real one is never touched.
+
+Usage: python bench_import.py [runs] [--importtime]
+
+--importtime also prints the 15 slowest imports of one app.py run (python -X importtime).
+"""
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DOTENV_PATH = os.path.join(APP_DIR, ".env")
+DEFERRED = ["google.generativeai", "PIL"]
+DUMMY_KEY = "bench-dummy-key"
+
+FIRST_PAGE = """
+import json, os, runpy, sys, time
+t = time.perf_counter()
+runpy.run_path("app.py", run_name="__main__")
+elapsed = time.perf_counter() - t
+print(json.dumps({"elapsed": elapsed, "has_key": bool(os.getenv("GOOGLE_API_KEY")),
+                  "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED,)
+
+def _env(key_in_env=True):
+    env = dict(os.environ)
+    env.pop("SCHEMESETU_SHARED_DB", None)
+    if key_in_env:
+        # A dummy key keeps app.py past the API key check; no request is made on the first page
+        env.setdefault("GOOGLE_API_KEY", DUMMY_KEY)
+    else:
+        env.pop("GOOGLE_API_KEY", None)
+    return env
+
+def _run(args, key_in_env=True):
+    out = subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=APP_DIR,
+                         env=_env(key_in_env))
+    if out.returncode != 0:
+        sys.exit(f"benchmark run failed:\n{out.stderr.strip()}")
+    return out
+
+def _installed(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:
+        return False
+
+def time_first_page(runs, key_in_env=True):
+    samples, loaded = [], set()
+    for _ in range(runs):
+        lines = _run(["-c", FIRST_PAGE], key_in_env).stdout.strip().splitlines()
+        result = json.loads(lines[-1]) if lines and lines[-1].startswith("{") else {"has_key": False}
+        if not result["has_key"]:
+            sys.exit("FAIL: app.py did not pick up GOOGLE_API_KEY")
+        samples.append(result["elapsed"])
+        loaded.update(result["loaded"])
+    return statistics.median(samples), loaded
+
+def time_first_page_with_dotenv(runs):
+    if os.path.exists(DOTENV_PATH):
+        return None, set()
+    with open(DOTENV_PATH, "w") as f:
+        f.write(f"GOOGLE_API_KEY={DUMMY_KEY}\n")
+    try:
+        return time_first_page(runs, key_in_env=False)
+    finally:
+        os.remove(DOTENV_PATH)
+
+def time_deferred(runs):
+    modules = [m for m in DEFERRED if _installed(m)]
+    code = "import time; t = time.perf_counter()\n" + "".join(f"import {m}\n" for m in modules)
+    code += "print(time.perf_counter() - t)"
+    samples = [float(_run(["-c", code]).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return statistics.median(samples), modules
+
+def print_importtime(limit=15):
+    stderr = _run(["-X", "importtime", "app.py"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    for cumulative, name in sorted(rows, reverse=True)[:limit]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    runs = int(args[0]) if args else 5
+    if not _installed("streamlit"):
+        sys.exit("streamlit is not installed; install the app's dependencies first.")
+
+    first_page, loaded = time_first_page(runs)
+    print(f"first page (env key):  {first_page * 1000:8.1f} ms (median of {runs})")
+    first_page, dotenv_loaded = time_first_page_with_dotenv(runs)
+    if first_page is None:
+        print("first page (.env key): skipped, a .env already exists")
+    else:
+        print(f"first page (.env key): {first_page * 1000:8.1f} ms (median of {runs})")
+    loaded |= dotenv_loaded
+    deferred, modules = time_deferred(runs)
+    print(f"deferred import:       {deferred * 1000:8.1f} ms ({', '.join(modules) or 'none installed'})")
+    if "--importtime" in sys.argv:
+        print("slowest imports:")
+        print_importtime()
+    if loaded:
+        sys.exit(f"FAIL: imported before the first LLM call or upload: {', '.join(sorted(loaded))}")